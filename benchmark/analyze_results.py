@@ -4,10 +4,14 @@ Analyze Timber benchmark results and compare with other tools.
 This script generates detailed reports and visualizations from benchmark data.
 """
 
+import itertools
 import os
 import sys
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # Non-interactive backend, charts are only saved to files
 import matplotlib.pyplot as plt
+from matplotlib.transforms import Bbox
 import numpy as np
 from tabulate import tabulate
 
@@ -16,6 +20,14 @@ BENCHMARK_DIR = "benchmark_data"
 RESULTS_FILE = os.path.join(BENCHMARK_DIR, "benchmark_results.csv")
 OUTPUT_DIR = os.path.join(BENCHMARK_DIR, "reports")
 
+# Charts are only rendered to PNG, so keep rasterization cheap
+plt.rcParams.update({
+    'path.simplify': True,
+    'path.simplify_threshold': 1.0,
+    'agg.path.chunksize': 10000,
+    'text.usetex': False,
+})
+
 def ensure_dirs():
     """Ensure output directories exist"""
     os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -26,31 +38,37 @@ def load_data():
         print(f"Error: Results file {RESULTS_FILE} not found")
         sys.exit(1)
 
-    df = pd.read_csv(RESULTS_FILE)
+    # Multi-threaded PyArrow parser. Columns keep the default NumPy dtypes so
+    # missing cells stay NaN, which the comparisons below rely on.
+    df = pd.read_csv(RESULTS_FILE, engine='pyarrow')
 
     # Extract file sizes from log names and convert to numeric values for sorting
-    df['size_name'] = df['log'].apply(lambda x: x.split('_')[1].split('.')[0])
+    df['size_name'] = df['log'].str.extract(r'_(?P<size_name>[^.]+)\.', expand=False)
 
     # Create numeric size column for proper sorting
-    size_mapping = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+    size_mapping = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000, '10m': 10_000_000}
     df['size_numeric'] = df['size_name'].map(size_mapping)
 
+    # Ordered categorical so size sorts by its integer codes. Categories are
+    # the observed sizes ordered by line count, so sizes missing from the
+    # mapping are kept (sorted last) rather than turned into NaN.
+    sizes = df[['size_name', 'size_numeric']].dropna(subset=['size_name']).drop_duplicates('size_name')
+    size_order = sizes.sort_values('size_numeric', na_position='last')['size_name'].tolist()
+    df['size_name'] = pd.Categorical(df['size_name'], categories=size_order, ordered=True)
+
     # Sort by tool name and size
-    df = df.sort_values(['tool', 'size_numeric'])
+    df = df.sort_values(['tool', 'size_name'])
 
     return df
 
-def generate_time_comparison(df):
+def generate_time_comparison(df, fig):
     """Generate time comparison chart across tools and file sizes"""
-    # Pivot data for plotting
+    # Pivot data for plotting (size_name is an ordered categorical, so rows
+    # already come out sorted by file size)
     pivot_df = df.pivot(index='size_name', columns='tool', values='time_seconds')
 
-    # Sort by file size
-    size_order = ['10k', '100k', '1m']
-    pivot_df = pivot_df.reindex(size_order)
-
     # Plot
-    fig, ax = plt.subplots(figsize=(12, 8))
+    ax = fig.add_subplot(111)
     pivot_df.plot(kind='bar', ax=ax)
 
     ax.set_title('Processing Time by Tool and File Size', fontsize=16)
@@ -58,27 +76,26 @@ def generate_time_comparison(df):
     ax.set_ylabel('Time (seconds)', fontsize=14)
     ax.set_yscale('log')  # Use log scale for better visibility
     ax.legend(title='Tool', fontsize=12)
-    ax.grid(True, which='both', linestyle='--', linewidth=0.5)
-
-    # Add values on top of bars
-    for container in ax.containers:
-        ax.bar_label(container, fmt='%.2f', fontsize=8)
-
-    plt.tight_layout()
-    plt.savefig(os.path.join(OUTPUT_DIR, 'time_comparison.png'), dpi=300)
-    plt.close()
-
-def generate_memory_comparison(df):
+    ax.grid(True, which='major', linestyle='--', linewidth=0.5)
+    ax.tick_params(which='minor', length=0)
+
+    # Add values on top of bars in a single pass. Bars are drawn column by
+    # column, so the transposed pivot values line up with ax.patches.
+    values = pivot_df.to_numpy(dtype=float, na_value=np.nan)
+    for bar, value in zip(ax.patches, values.T.ravel()):
+        if np.isnan(value):
+            continue
+        ax.annotate(f'{value:.2f}', (bar.get_x() + bar.get_width() / 2, value),
+                    xytext=(0, 2), textcoords='offset points', ha='center', fontsize=8)
+
+def generate_memory_comparison(df, fig):
     """Generate memory usage comparison chart across tools and file sizes"""
-    # Pivot data for plotting
+    # Pivot data for plotting (size_name is an ordered categorical, so rows
+    # already come out sorted by file size)
     pivot_df = df.pivot(index='size_name', columns='tool', values='memory_mb')
 
-    # Sort by file size
-    size_order = ['10k', '100k', '1m']
-    pivot_df = pivot_df.reindex(size_order)
-
     # Plot
-    fig, ax = plt.subplots(figsize=(12, 8))
+    ax = fig.add_subplot(111)
     pivot_df.plot(kind='bar', ax=ax)
 
     ax.set_title('Memory Usage by Tool and File Size', fontsize=16)
@@ -86,29 +103,34 @@ def generate_memory_comparison(df):
     ax.set_ylabel('Memory (MB)', fontsize=14)
     ax.set_yscale('log')  # Use log scale for better visibility
     ax.legend(title='Tool', fontsize=12)
-    ax.grid(True, which='both', linestyle='--', linewidth=0.5)
-
-    # Add values on top of bars
-    for container in ax.containers:
-        ax.bar_label(container, fmt='%.1f', fontsize=8)
-
-    plt.tight_layout()
-    plt.savefig(os.path.join(OUTPUT_DIR, 'memory_comparison.png'), dpi=300)
-    plt.close()
-
-def generate_scaling_analysis(df):
+    ax.grid(True, which='major', linestyle='--', linewidth=0.5)
+    ax.tick_params(which='minor', length=0)
+
+    # Add values on top of bars in a single pass. Bars are drawn column by
+    # column, so the transposed pivot values line up with ax.patches.
+    values = pivot_df.to_numpy(dtype=float, na_value=np.nan)
+    for bar, value in zip(ax.patches, values.T.ravel()):
+        if np.isnan(value):
+            continue
+        ax.annotate(f'{value:.1f}', (bar.get_x() + bar.get_width() / 2, value),
+                    xytext=(0, 2), textcoords='offset points', ha='center', fontsize=8)
+
+def generate_scaling_analysis(df, fig):
     """Generate analysis of how each tool scales with file size"""
-    # Create a figure for the scaling analysis
-    fig, ax = plt.subplots(figsize=(12, 8))
+    # Create a plot for the scaling analysis
+    ax = fig.add_subplot(111)
+
+    # Sort and group by tool once, shared by the plot and the scaling factors
+    ordered = df.sort_values(['tool', 'size_numeric'])
+    tool_groups = ordered.groupby('tool', sort=False)
 
-    tools = df['tool'].unique()
     markers = ['o', 's', '^', 'D', 'v', '<', '>', 'p', '*', 'h', 'H', '+', 'x', 'd', '|']
+    tool_markers = dict(zip(ordered['tool'].unique(), itertools.cycle(markers)))
 
     # Plot lines for each tool
-    for i, tool in enumerate(tools):
-        tool_data = df[df['tool'] == tool]
+    for tool, tool_data in tool_groups:
         ax.plot(tool_data['size_numeric'], tool_data['time_seconds'],
-                marker=markers[i % len(markers)], label=tool, linewidth=2, markersize=8)
+                marker=tool_markers[tool], label=tool, linewidth=2, markersize=8)
 
     ax.set_title('Performance Scaling by File Size', fontsize=16)
     ax.set_xlabel('Number of Lines', fontsize=14)
@@ -118,37 +140,33 @@ def generate_scaling_analysis(df):
     ax.grid(True, which='both', linestyle='--', linewidth=0.5)
     ax.legend(title='Tool', fontsize=12)
 
-    # Add labels for specific points
-    size_labels = {10_000: '10k', 100_000: '100k', 1_000_000: '1m'}
-    ax.set_xticks(list(size_labels.keys()))
-    ax.set_xticklabels(list(size_labels.values()))
-
-    plt.tight_layout()
-    plt.savefig(os.path.join(OUTPUT_DIR, 'scaling_analysis.png'), dpi=300)
-    plt.close()
-
-    # Calculate and save scaling factors
-    scaling_data = []
-
-    for tool in tools:
-        tool_data = df[df['tool'] == tool].sort_values('size_numeric')
-
-        if len(tool_data) >= 2:
-            # Calculate scaling factor between each consecutive file size
-            for i in range(1, len(tool_data)):
-                size_ratio = tool_data.iloc[i]['size_numeric'] / tool_data.iloc[i-1]['size_numeric']
-                time_ratio = tool_data.iloc[i]['time_seconds'] / tool_data.iloc[i-1]['time_seconds']
-                scaling_factor = time_ratio / size_ratio
-
-                scaling_data.append({
-                    'Tool': tool,
-                    'Size Change': f"{tool_data.iloc[i-1]['size_name']} → {tool_data.iloc[i]['size_name']}",
-                    'Time Increase': f"{time_ratio:.2f}x",
-                    'Scaling Factor': f"{scaling_factor:.3f}"
-                })
-
-    # Convert to DataFrame and save
-    scaling_df = pd.DataFrame(scaling_data)
+    # Label the file sizes present in the data, so the ticks follow load_data's
+    # size mapping
+    size_labels = ordered[['size_numeric', 'size_name']].dropna().drop_duplicates('size_numeric')
+    ax.set_xticks(size_labels['size_numeric'].tolist())
+    ax.set_xticklabels(size_labels['size_name'].astype(str).tolist())
+
+    # Calculate and save scaling factors between each consecutive file size,
+    # comparing every row with the previous size of the same tool. Only the
+    # first row of each tool has no previous size; rows with missing
+    # measurements are kept and show up as nan.
+    prev = tool_groups[['size_numeric', 'time_seconds', 'size_name']].shift(1)
+    has_prev = prev['size_name'].notna()
+
+    scaling_df = pd.DataFrame({
+        'Tool': ordered['tool'],
+        'Size Change': prev['size_name'].astype(str) + ' → ' + ordered['size_name'].astype(str),
+        'Time Ratio': ordered['time_seconds'] / prev['time_seconds'],
+        'Size Ratio': ordered['size_numeric'] / prev['size_numeric'],
+    })[has_prev].reset_index(drop=True)
+    scaling_df['Scaling Factor'] = scaling_df['Time Ratio'] / scaling_df['Size Ratio']
+
+    # Format display columns
+    scaling_df['Time Increase'] = scaling_df['Time Ratio'].map('{:.2f}x'.format)
+    scaling_df['Scaling Factor'] = scaling_df['Scaling Factor'].map('{:.3f}'.format)
+    scaling_df = scaling_df[['Tool', 'Size Change', 'Time Increase', 'Scaling Factor']]
+
+    # Save scaling factors
     scaling_df.to_csv(os.path.join(OUTPUT_DIR, 'scaling_factors.csv'), index=False)
 
     # Print scaling analysis
@@ -157,18 +175,20 @@ def generate_scaling_analysis(df):
 
 def generate_rankings(df):
     """Generate performance rankings for each file size"""
-    size_names = df['size_name'].unique()
-
-    for size in size_names:
-        size_df = df[df['size_name'] == size].copy()
-
-        # Get rankings for time and memory
-        size_df['time_rank'] = size_df['time_seconds'].rank()
-        size_df['memory_rank'] = size_df['memory_mb'].rank()
-
-        # Calculate combined score (equally weighted)
-        size_df['combined_score'] = (size_df['time_rank'] + size_df['memory_rank']) / 2
+    # Get rankings for time and memory within each file size in one pass
+    ranks = df.groupby('size_name', observed=True)[['time_seconds', 'memory_mb']].rank()
+
+    # Calculate combined score (equally weighted). A missing rank leaves the
+    # score NaN, so tools with incomplete data sort last.
+    ranked = df.assign(
+        time_rank=ranks['time_seconds'],
+        memory_rank=ranks['memory_mb'],
+        combined_score=ranks.mean(axis=1, skipna=False),
+    )
 
+    # Groups come out in file size order (smallest first), whichever tool
+    # happens to list a size first
+    for size, size_df in ranked.groupby('size_name', observed=True):
         # Sort by combined score
         size_df = size_df.sort_values('combined_score')
 
@@ -176,16 +196,16 @@ def generate_rankings(df):
         result_df = size_df[['tool', 'time_seconds', 'memory_mb', 'time_rank', 'memory_rank', 'combined_score']]
         result_df.columns = ['Tool', 'Time (s)', 'Memory (MB)', 'Time Rank', 'Memory Rank', 'Combined Score']
 
-        # Format numeric columns
-        result_df['Time (s)'] = result_df['Time (s)'].map('{:.3f}'.format)
-        result_df['Memory (MB)'] = result_df['Memory (MB)'].map('{:.2f}'.format)
+        # Save to CSV, rounding each measurement column to its own precision
+        # and leaving the rank columns as they are
+        result_df.round({'Time (s)': 3, 'Memory (MB)': 2}).to_csv(
+            os.path.join(OUTPUT_DIR, f'ranking_{size}.csv'), index=False, lineterminator='\n'
+        )
 
-        # Save to CSV
-        result_df.to_csv(os.path.join(OUTPUT_DIR, f'ranking_{size}.csv'), index=False)
-
-        # Print ranking table
+        # Print ranking table (floatfmt includes the index column)
         print(f"\nTool Rankings for {size} lines:")
-        print(tabulate(result_df, headers='keys', tablefmt='grid'))
+        print(tabulate(result_df, headers='keys', tablefmt='grid',
+                       floatfmt=('g', 'g', '.3f', '.2f', 'g', 'g', 'g')))
 
 def generate_timber_specific_analysis(df):
     """Generate Timber-specific performance analysis"""
@@ -205,71 +225,69 @@ def generate_timber_specific_analysis(df):
     timber_analysis = timber_data[['size_name', 'time_seconds', 'memory_mb', 'lines_per_second', 'lines_per_mb']]
     timber_analysis.columns = ['File Size', 'Time (s)', 'Memory (MB)', 'Lines/Second', 'Lines/MB']
 
-    # Format numeric columns
-    timber_analysis['Time (s)'] = timber_analysis['Time (s)'].map('{:.3f}'.format)
-    timber_analysis['Memory (MB)'] = timber_analysis['Memory (MB)'].map('{:.2f}'.format)
-    timber_analysis['Lines/Second'] = timber_analysis['Lines/Second'].map('{:.0f}'.format)
-    timber_analysis['Lines/MB'] = timber_analysis['Lines/MB'].map('{:.0f}'.format)
+    # Throughput columns are whole numbers. A zero time or memory reading gives
+    # inf, which is treated as missing, and the nullable Int64 dtype keeps
+    # missing values as NA instead of failing the cast.
+    for col in ['Lines/Second', 'Lines/MB']:
+        timber_analysis[col] = timber_analysis[col].replace([np.inf, -np.inf], np.nan).round().astype('Int64')
 
-    # Save to CSV
-    timber_analysis.to_csv(os.path.join(OUTPUT_DIR, 'timber_analysis.csv'), index=False)
+    # Save to CSV, rounding each measurement column to its own precision
+    timber_analysis.round({'Time (s)': 3, 'Memory (MB)': 2}).to_csv(
+        os.path.join(OUTPUT_DIR, 'timber_analysis.csv'), index=False, lineterminator='\n'
+    )
 
-    # Print timber analysis
+    # Print timber analysis (floatfmt includes the index column)
     print("\nTimber Performance Analysis:")
-    print(tabulate(timber_analysis, headers='keys', tablefmt='grid'))
+    print(tabulate(timber_analysis, headers='keys', tablefmt='grid',
+                   floatfmt=('g', 'g', '.3f', '.2f', 'g', 'g')))
 
-def generate_comparative_analysis(df):
+def generate_comparative_analysis(df, fig):
     """Generate comparative analysis between Timber and other tools"""
-    # For each file size, calculate the ratio of each tool's time to Timber's time
-    size_names = df['size_name'].unique()
-    comparative_data = []
-
-    for size in size_names:
-        size_df = df[df['size_name'] == size].copy()
-
-        # Get Timber's performance as baseline
-        timber_time = size_df[size_df['tool'] == 'timber']['time_seconds'].values
-        timber_memory = size_df[size_df['tool'] == 'timber']['memory_mb'].values
-
-        if len(timber_time) == 0:
-            continue  # Skip if no Timber data
-
-        timber_time = timber_time[0]
-        timber_memory = timber_memory[0]
-
-        # Calculate ratios for each tool
-        for _, row in size_df.iterrows():
-            if row['tool'] != 'timber':
-                time_ratio = timber_time / row['time_seconds']
-                memory_ratio = timber_memory / row['memory_mb']
-
-                comparative_data.append({
-                    'File Size': size,
-                    'Tool': row['tool'],
-                    'Time Ratio': time_ratio,  # >1 means tool is faster than Timber
-                    'Memory Ratio': memory_ratio,  # >1 means tool uses less memory than Timber
-                    'Timber Time (s)': timber_time,
-                    'Tool Time (s)': row['time_seconds'],
-                    'Timber Memory (MB)': timber_memory,
-                    'Tool Memory (MB)': row['memory_mb']
-                })
-
-    if not comparative_data:
+    # Get Timber's performance for each file size as baseline
+    timber_df = df[df['tool'] == 'timber'].drop_duplicates('size_name')
+    timber_df = timber_df[['size_name', 'time_seconds', 'memory_mb']].rename(
+        columns={'time_seconds': 'Timber Time (s)', 'memory_mb': 'Timber Memory (MB)'}
+    )
+
+    # Join every other tool against Timber on file size (sizes without Timber
+    # data drop out of the inner join)
+    comparative_df = df[df['tool'] != 'timber'].merge(timber_df, on='size_name', how='inner')
+
+    if comparative_df.empty:
         print("No comparative data available")
         return
 
-    # Convert to DataFrame
-    comparative_df = pd.DataFrame(comparative_data)
-
-    # Add formatted columns for display
-    comparative_df['Time Comparison'] = comparative_df.apply(
-        lambda x: f"Timber is {1/x['Time Ratio']:.2f}x slower" if x['Time Ratio'] < 1
-        else f"Timber is {x['Time Ratio']:.2f}x faster", axis=1
+    comparative_df = comparative_df.sort_values(['size_name', 'tool']).reset_index(drop=True)
+    comparative_df = comparative_df.rename(columns={
+        'size_name': 'File Size',
+        'tool': 'Tool',
+        'time_seconds': 'Tool Time (s)',
+        'memory_mb': 'Tool Memory (MB)',
+    })
+
+    # Calculate ratios for each tool
+    # Time Ratio >1 means tool is faster than Timber
+    # Memory Ratio >1 means tool uses less memory than Timber
+    comparative_df['Time Ratio'] = comparative_df['Timber Time (s)'] / comparative_df['Tool Time (s)']
+    comparative_df['Memory Ratio'] = comparative_df['Timber Memory (MB)'] / comparative_df['Tool Memory (MB)']
+    comparative_df = comparative_df[['File Size', 'Tool', 'Time Ratio', 'Memory Ratio',
+                                     'Timber Time (s)', 'Tool Time (s)',
+                                     'Timber Memory (MB)', 'Tool Memory (MB)']]
+
+    # Add formatted columns for display, building both wordings column-wise
+    # and selecting per row
+    time_ratio = comparative_df['Time Ratio']
+    comparative_df['Time Comparison'] = np.where(
+        time_ratio < 1,
+        'Timber is ' + (1 / time_ratio).map('{:.2f}'.format) + 'x slower',
+        'Timber is ' + time_ratio.map('{:.2f}'.format) + 'x faster'
     )
 
-    comparative_df['Memory Comparison'] = comparative_df.apply(
-        lambda x: f"Timber uses {1/x['Memory Ratio']:.2f}x more memory" if x['Memory Ratio'] < 1
-        else f"Timber uses {x['Memory Ratio']:.2f}x less memory", axis=1
+    memory_ratio = comparative_df['Memory Ratio']
+    comparative_df['Memory Comparison'] = np.where(
+        memory_ratio < 1,
+        'Timber uses ' + (1 / memory_ratio).map('{:.2f}'.format) + 'x more memory',
+        'Timber uses ' + memory_ratio.map('{:.2f}'.format) + 'x less memory'
     )
 
     # Save to CSV
@@ -280,8 +298,8 @@ def generate_comparative_analysis(df):
     display_df = comparative_df[['File Size', 'Tool', 'Time Comparison', 'Memory Comparison']]
     print(tabulate(display_df, headers='keys', tablefmt='grid'))
 
-    # Create visualization for comparative analysis
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(18, 8))
+    # Create visualization for comparative analysis (two side-by-side plots)
+    ax1, ax2 = fig.subplots(1, 2)
 
     # Group by tool and file size, then plot time ratio
     pivot_time = comparative_df.pivot(index='Tool', columns='File Size', values='Time Ratio')
@@ -299,9 +317,35 @@ def generate_comparative_analysis(df):
     ax2.axvline(x=1, color='r', linestyle='--')
     ax2.grid(True, which='both', linestyle='--', linewidth=0.5)
 
-    plt.tight_layout()
-    plt.savefig(os.path.join(OUTPUT_DIR, 'comparative_analysis.png'), dpi=300)
-    plt.close()
+def build_dashboard(df):
+    """Draw all charts on one 2x2 figure and save it along with one PNG per chart"""
+    fig = plt.figure(figsize=(24, 16), layout='constrained')
+    panels = fig.subfigures(2, 2)
+
+    charts = [
+        ('time_comparison.png', generate_time_comparison),
+        ('memory_comparison.png', generate_memory_comparison),
+        ('scaling_analysis.png', generate_scaling_analysis),
+        ('comparative_analysis.png', generate_comparative_analysis),
+    ]
+
+    for panel, (_, generate) in zip(panels.flat, charts):
+        generate(df, panel)
+
+    fig.savefig(os.path.join(OUTPUT_DIR, 'dashboard.png'), dpi=150)
+
+    # Crop each chart out of the already laid out figure using the tight
+    # bounding box of its axes
+    renderer = fig.canvas.get_renderer()
+    for panel, (filename, _) in zip(panels.flat, charts):
+        if not panel.axes:
+            continue  # Chart had no data to draw
+
+        bbox = Bbox.union([ax.get_tightbbox(renderer) for ax in panel.axes])
+        fig.savefig(os.path.join(OUTPUT_DIR, filename), dpi=150,
+                    bbox_inches=bbox.transformed(fig.dpi_scale_trans.inverted()).padded(0.1))
+
+    plt.close(fig)
 
 def main():
     """Main function to run the analysis"""
@@ -312,12 +356,9 @@ def main():
     df = load_data()
 
     # Generate visualizations and reports
-    generate_time_comparison(df)
-    generate_memory_comparison(df)
-    generate_scaling_analysis(df)
+    build_dashboard(df)
     generate_rankings(df)
     generate_timber_specific_analysis(df)
-    generate_comparative_analysis(df)
 
     print(f"\nAnalysis complete. Reports saved to {OUTPUT_DIR}")
 
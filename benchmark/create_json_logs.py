@@ -1,9 +1,20 @@
-import json
-import random
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 
+import numpy as np
+
+try:
+    from orjson import dumps as dump_json
+except ImportError:
+    # Fall back to the standard library encoder with compact separators, so
+    # the output is byte-for-byte identical to orjson's
+    import json
+
+    def dump_json(obj):
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
 def create_json_log(count, filename):
     print(f"Creating {count} JSON log entries in {filename}")
     services = ["api", "auth", "payment", "database", "frontend", "cache", "search", "notification"]
@@ -23,80 +34,134 @@ def create_json_log(count, filename):
         "Authentication token expired"
     ]
     status_codes = [200, 201, 204, 400, 401, 403, 404, 500, 503]
+    methods = ["GET", "POST", "PUT", "DELETE"]
+    paths = ["users", "orders", "products", "carts"]
+    content_types = ["application/json", "text/html", "application/xml"]
+    roles = ["admin", "user", "guest"]
+    error_types = ["NullPointerException", "ConnectionTimeout", "AuthenticationFailure", "DatabaseError"]
 
-    # Generate random but deterministic log entries
-    random.seed(42)  # For reproducible results
-    base_time = datetime.now() - timedelta(days=1)
+    # The nested request and user objects come from a small fixed space, so
+    # build every variant once and pick one per row. Rows share these dicts,
+    # which is safe because they are only ever serialized.
+    request_templates = [
+        {
+            "method": method,
+            "path": f"/api/v1/{path}",
+            "headers": {
+                "content-type": content_type,
+                "user-agent": "Mozilla/5.0"
+            }
+        }
+        for method in methods
+        for path in paths
+        for content_type in content_types
+    ]
+    user_templates = [
+        {"id": f"user_{user_id}", "role": role}
+        for user_id in range(1000, 10000)
+        for role in roles
+    ]
 
-    with open(filename, 'w') as f:
-        for i in range(count):
-            timestamp = (base_time + timedelta(seconds=i)).isoformat()
-            service = random.choice(services)
+    # Generate random but deterministic log entries. Rows are produced in
+    # batches: each batch makes its random draws with one vectorized call per
+    # column and the loop below only indexes into them, so memory stays
+    # bounded by the batch size rather than the row count. tolist() converts
+    # to native Python ints for cheap indexing.
+    rng = np.random.default_rng(42)  # For reproducible results
+    base_time = np.datetime64(datetime.now() - timedelta(days=1), 's')
 
-            # Make ERROR level appear in about 15% of logs
-            level = "ERROR" if random.random() < 0.15 else random.choice(levels)
+    # Serialized rows are accumulated in a bytearray and flushed once per
+    # batch through a 4 MiB binary buffer, so the file sees a few large
+    # writes instead of one per row.
+    batch_size = 10_000
+    buf = bytearray()
 
+    with open(filename, 'wb', buffering=4 * 1024 * 1024) as f:
+        for start in range(0, count, batch_size):
+            n = min(batch_size, count - start)
+
+            timestamps = (base_time + np.arange(start, start + n, dtype='timedelta64[s]')).astype(str).tolist()
+
+            svc_idx = rng.integers(0, len(services), n).tolist()
+            lvl_idx = rng.integers(0, len(levels), n).tolist()
+            msg_idx = rng.integers(0, len(messages), n).tolist()
+            status_idx = rng.integers(0, len(status_codes), n).tolist()
+
+            # Make ERROR level appear in about 15% of logs
+            err_mask = (rng.random(n) < 0.15).tolist()
             # Make status 500 appear in about 5% of logs
-            status = 500 if random.random() < 0.05 else random.choice(status_codes)
-
-            response_time = random.randint(10, 2000)  # 10ms to 2s
-
-            # Create nested fields for some services
-            if service == "api":
-                request = {
-                    "method": random.choice(["GET", "POST", "PUT", "DELETE"]),
-                    "path": f"/api/v1/{random.choice(['users', 'orders', 'products', 'carts'])}",
-                    "headers": {
-                        "content-type": random.choice(["application/json", "text/html", "application/xml"]),
-                        "user-agent": "Mozilla/5.0"
-                    }
-                }
-            else:
-                request = None
-
-            # Add user info for auth service
-            if service == "auth":
-                user = {
-                    "id": f"user_{random.randint(1000, 9999)}",
-                    "role": random.choice(["admin", "user", "guest"])
-                }
-            else:
-                user = None
-
-            # Basic log structure
-            log_entry = {
-                "timestamp": timestamp,
-                "service": service,
-                "level": level,
-                "message": random.choice(messages),
-                "request_id": f"req-{random.randint(10000, 99999)}",
-                "status": status,
-                "response_time": response_time
-            }
+            status_mask = (rng.random(n) < 0.05).tolist()
+
+            resp = rng.integers(10, 2001, n).tolist()  # 10ms to 2s
+            req_ids = rng.integers(10000, 100000, n).tolist()
+
+            # Draws for the nested fields, only consumed by the rows that need them
+            request_idx = rng.integers(0, len(request_templates), n).tolist()
+            user_idx = rng.integers(0, len(user_templates), n).tolist()
+            err_type_idx = rng.integers(0, len(error_types), n).tolist()
+            err_codes = rng.integers(1000, 10000, n).tolist()
+
+            for i in range(n):
+                service = services[svc_idx[i]]
+                level = "ERROR" if err_mask[i] else levels[lvl_idx[i]]
+                status = 500 if status_mask[i] else status_codes[status_idx[i]]
 
-            # Add nested fields if present
-            if request:
-                log_entry["request"] = request
-            if user:
-                log_entry["user"] = user
-
-            # Add error details for ERROR level
-            if level == "ERROR":
-                log_entry["error"] = {
-                    "type": random.choice(["NullPointerException", "ConnectionTimeout", "AuthenticationFailure", "DatabaseError"]),
-                    "code": random.randint(1000, 9999)
+                # Create nested fields for some services
+                request = request_templates[request_idx[i]] if service == "api" else None
+
+                # Add user info for auth service
+                user = user_templates[user_idx[i]] if service == "auth" else None
+
+                # Basic log structure
+                log_entry = {
+                    "timestamp": timestamps[i],
+                    "service": service,
+                    "level": level,
+                    "message": messages[msg_idx[i]],
+                    "request_id": f"req-{req_ids[i]}",
+                    "status": status,
+                    "response_time": resp[i]
                 }
 
-            # Write the JSON object
-            f.write(json.dumps(log_entry) + "\n")
+                # Add nested fields if present
+                if request:
+                    log_entry["request"] = request
+                if user:
+                    log_entry["user"] = user
 
-bench_dir = sys.argv[1]
-with_large = (len(sys.argv) > 2 and sys.argv[2].lower() == 'true')
+                # Add error details for ERROR level
+                if level == "ERROR":
+                    log_entry["error"] = {
+                        "type": error_types[err_type_idx[i]],
+                        "code": err_codes[i]
+                    }
+
+                # Append the JSON object to the current batch
+                buf += dump_json(log_entry)
+                buf += b"\n"
+
+            f.write(buf)
+            buf.clear()
+
+def create_json_log_job(job):
+    """Unpack a (count, filename) job so it can be mapped over a process pool"""
+    count, filename = job
+    create_json_log(count, filename)
+
+if __name__ == "__main__":
+    bench_dir = sys.argv[1]
+    with_large = (len(sys.argv) > 2 and sys.argv[2].lower() == 'true')
+
+    # Create datasets of different sizes
+    jobs = [
+        (10000, os.path.join(bench_dir, "bench_json_10k.json")),
+        (100000, os.path.join(bench_dir, "bench_json_100k.json")),
+        (1000000, os.path.join(bench_dir, "bench_json_1m.json")),
+    ]
 
-# Create datasets of different sizes
-create_json_log(10000, os.path.join(bench_dir, "bench_json_10k.json"))
-create_json_log(100000, os.path.join(bench_dir, "bench_json_100k.json"))
-create_json_log(1000000, os.path.join(bench_dir, "bench_json_1m.json"))
+    if with_large:
+        jobs.append((10000000, os.path.join(bench_dir, "bench_json_10m.json")))
 
-if with_large:
-    create_json_log(10000000, os.path.join(bench_dir, "bench_json_10m.json"))
\ No newline at end of file
+    # The datasets are independent, so generate them in parallel
+    with ProcessPoolExecutor(max_workers=min(4, len(jobs))) as executor:
+        list(executor.map(create_json_log_job, jobs))
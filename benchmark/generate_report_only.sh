@@ -91,10 +91,20 @@ cat > $BENCH_DIR/reports/$TIMESTAMP/analyze_benchmarks.py << 'EOFA'
 import os
 import sys
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # Non-interactive backend, charts are only saved to files
 import matplotlib.pyplot as plt
 import numpy as np
 from tabulate import tabulate
 
+# Charts are only rendered to PNG, so keep rasterization cheap
+plt.rcParams.update({
+    'path.simplify': True,
+    'path.simplify_threshold': 1.0,
+    'agg.path.chunksize': 10000,
+    'text.usetex': False,
+})
+
 # Load benchmark results
 results_file = "benchmark_results.csv"
 if not os.path.exists(results_file):
@@ -237,7 +247,7 @@ def generate_category_charts(category_df, category_name):
                 )
 
             plt.tight_layout()
-            plt.savefig(f"{category_name.lower().replace(' ', '_')}_{size}_time.png", dpi=300)
+            plt.savefig(f"{category_name.lower().replace(' ', '_')}_{size}_time.png", dpi=150)
             plt.close()
 
             # Generate memory comparison chart
@@ -269,7 +279,7 @@ def generate_category_charts(category_df, category_name):
                 )
 
             plt.tight_layout()
-            plt.savefig(f"{category_name.lower().replace(' ', '_')}_{size}_memory.png", dpi=300)
+            plt.savefig(f"{category_name.lower().replace(' ', '_')}_{size}_memory.png", dpi=150)
             plt.close()
 
             # Generate throughput comparison chart
@@ -300,7 +310,7 @@ def generate_category_charts(category_df, category_name):
                 )
 
             plt.tight_layout()
-            plt.savefig(f"{category_name.lower().replace(' ', '_')}_{size}_throughput.png", dpi=300)
+            plt.savefig(f"{category_name.lower().replace(' ', '_')}_{size}_throughput.png", dpi=150)
             plt.close()
 
             # Save results to CSV for reference
@@ -361,7 +371,7 @@ def generate_scaling_charts(df):
             plt.legend(title='Tool')
 
             plt.tight_layout()
-            plt.savefig(f"{category.lower()}_scaling.png", dpi=300)
+            plt.savefig(f"{category.lower()}_scaling.png", dpi=150)
             plt.close()
 
             # Calculate scaling factors
@@ -492,7 +502,7 @@ def generate_timber_analysis(df):
                         plt.xticks(range(len(heatmap_data.columns)), heatmap_data.columns, rotation=45)
                         plt.title('Timberjack Feature Performance by File Size')
                         plt.tight_layout()
-                        plt.savefig('timber_feature_performance.png', dpi=300)
+                        plt.savefig('timber_feature_performance.png', dpi=150)
                         plt.close()
                     else:
                         print("Cannot create heatmap - invalid maximum value")
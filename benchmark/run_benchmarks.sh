@@ -168,7 +168,7 @@ check_dependencies() {
 
     # Install Python dependencies
     echo "Installing required Python packages..."
-    pip3 install pandas matplotlib tabulate psutil &> /dev/null || pip install pandas matplotlib tabulate psutil || echo "Failed to install Python packages. Some features may not work."
+    pip3 install pandas matplotlib tabulate psutil orjson pyarrow &> /dev/null || pip install pandas matplotlib tabulate psutil orjson pyarrow || echo "Failed to install Python packages. Some features may not work."
 
     echo "Dependencies check completed."
 }